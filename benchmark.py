@@ -0,0 +1,334 @@
+# ============================================================================
+# benchmark.py
+# Banco de pruebas de rendimiento con gramáticas y cargas sintéticas
+# ============================================================================
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Tuple
+
+from grammar import Grammar, read_grammar_from_string
+from first import FirstCalculator
+from follow import FollowCalculator
+from table import LR1Table
+from parser import Parser
+from generator import SentenceGenerator
+from stats import Stats
+
+
+# Operadores de un carácter para las gramáticas de expresiones (el parser
+# separa la entrada carácter por carácter). No incluye '|', que separa
+# alternativas en el texto de la gramática.
+OPERATORS = '+-*/%^&,<>=!~?@#'
+
+# Terminales de un carácter que representan los tokens del Scanner
+STATEMENT_GRAMMAR = """
+P -> L
+L -> L T | T
+T -> i ( X ) B | i ( X ) B e B | w ( X ) B | f ( D ; X ; D ) B | u n ( ) B | r X ; | D ;
+B -> { L } | { }
+D -> n = X
+X -> X o A | A
+A -> A & N | N
+N -> ! N | C
+C -> C q E | C x E | C < E | C > E | C l E | C g E | E
+E -> E + M | E - M | M
+M -> M * U | M / U | M % U | U
+U -> - U | ( X ) | n | 0 | n ( )
+"""
+
+STATEMENTS = [
+    "n=0;",
+    "n=n+0*(n-0);",
+    "i(n<0){n=n+0;}",
+    "i(!n&nq0on>0){n=0;}e{n=n%0;}",
+    "w(n>0){n=n-0;}",
+    "f(n=0;nl0;n=n+0){r n;}",
+    "u n(){r n*(0+n);}",
+    "i(ng0){}",
+]
+
+
+def grammar_to_string(grammar: Grammar) -> str:
+    """Serializa una gramática al formato de read_grammar_from_file"""
+    lines = []
+    for lhs, rhs_list in grammar.productions.items():
+        alternatives = [' '.join(rhs) for rhs in rhs_list]
+        lines.append(f"{lhs} -> {' | '.join(alternatives)}")
+    return '\n'.join(lines)
+
+
+def expression_grammar(levels: int) -> Grammar:
+    """
+    Gramática de expresiones con `levels` niveles de precedencia:
+        E0 -> E0 + E1 | E1
+        E1 -> E1 - E2 | E2
+        ...
+        En -> ( E0 ) | a
+    """
+    if not 1 <= levels <= len(OPERATORS):
+        raise ValueError(f"levels debe estar entre 1 y {len(OPERATORS)}")
+
+    productions = {}
+    for level in range(levels):
+        current, lower = f"E{level}", f"E{level + 1}"
+        productions[current] = [[current, OPERATORS[level], lower], [lower]]
+    productions[f"E{levels}"] = [['(', 'E0', ')'], ['a']]
+    return Grammar(productions, 'E0')
+
+
+def expression_inputs(levels: int, count: int, length: int, rng: random.Random) -> List[str]:
+    """Genera `count` expresiones válidas de aproximadamente `length` tokens"""
+    inputs = []
+    for _ in range(count):
+        tokens = ['a']
+        while len(tokens) < length:
+            tokens.append(rng.choice(OPERATORS[:levels]))
+            if rng.random() < 0.2:
+                tokens.extend(['(', 'a', rng.choice(OPERATORS[:levels]), 'a', ')'])
+            else:
+                tokens.append('a')
+        inputs.append(''.join(tokens))
+    return inputs
+
+
+def statement_grammar() -> Grammar:
+    """Gramática de sentencias con un conjunto de terminales como el del Scanner"""
+    return read_grammar_from_string(STATEMENT_GRAMMAR)
+
+
+def statement_inputs(count: int, length: int, rng: random.Random) -> List[str]:
+    """Genera `count` programas válidos de aproximadamente `length` tokens"""
+    inputs = []
+    for _ in range(count):
+        program = []
+        size = 0
+        while size < length:
+            statement = rng.choice(STATEMENTS)
+            program.append(statement)
+            size += len(statement.replace(" ", ""))
+        inputs.append(''.join(program))
+    return inputs
+
+
+def random_grammar(num_non_terminals: int, num_terminals: int, rng: random.Random) -> Grammar:
+    """
+    Gramática aleatoria LL(1), y por lo tanto LR(1) sin conflictos. Cada
+    alternativa empieza con un terminal distinto dentro de su no terminal y
+    no hay producciones vacías. Cada no terminal tiene al menos una producción
+    que solo usa no terminales posteriores, así todos son productivos.
+    """
+    non_terminals = [f"N{i}" for i in range(num_non_terminals)]
+    terminals = [chr(ord('a') + i) for i in range(num_terminals)]
+
+    productions = {}
+    for i, non_term in enumerate(non_terminals):
+        later = non_terminals[i + 1:]
+        count = rng.randint(2, min(4, num_terminals))
+        starts = rng.sample(terminals, count)
+
+        base = [starts[0]]
+        if later:
+            base.append(rng.choice(later))
+        rhs_list = [base]
+
+        for start in starts[1:]:
+            length = rng.randint(0, 3)
+            rhs_list.append([start] + [rng.choice(terminals + non_terminals)
+                                       for _ in range(length)])
+        productions[non_term] = rhs_list
+
+    return Grammar(productions, non_terminals[0])
+
+
+def build_workloads(suite: str, seed: int) -> List[Tuple[str, Dict, str, List[str]]]:
+    """
+    Construye las cargas de trabajo de una suite.
+
+    Returns:
+        lista de (nombre, parámetros, texto de la gramática, entradas)
+    """
+    rng = random.Random(seed)
+    scale = {'small': 1, 'default': 2, 'large': 4}[suite]
+    workloads = []
+
+    for levels in (2, 4 * scale):
+        grammar = expression_grammar(levels)
+        params = {'levels': levels}
+        inputs = expression_inputs(levels, 50 * scale, 60, rng)
+        workloads.append((f"expr-{levels}", params, grammar_to_string(grammar), inputs))
+
+    grammar = statement_grammar()
+    inputs = statement_inputs(20 * scale, 60, rng)
+    workloads.append(("statements", {}, grammar_to_string(grammar), inputs))
+
+    for size in (4, 6 * scale):
+        grammar = random_grammar(size, 4, rng)
+        params = {'non_terminals': size, 'terminals': 4, 'seed': seed}
+        generator = SentenceGenerator(grammar, seed=seed)
+        inputs = [''.join(generator.generate(30)) for _ in range(20 * scale)]
+        workloads.append((f"random-{size}", params, grammar_to_string(grammar), inputs))
+
+    return workloads
+
+
+def run_workload(grammar_text: str, inputs: List[str], repeat: int) -> Dict:
+    """Mide cada fase de la construcción y el parsing de una carga de trabajo"""
+    phases = {'load': [], 'first': [], 'follow': [], 'table': [], 'parse': []}
+    accepted = 0
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        grammar = read_grammar_from_string(grammar_text)
+        phases['load'].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        first_calc = FirstCalculator(grammar)
+        phases['first'].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        FollowCalculator(grammar, first_calc)
+        phases['follow'].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        lr1_table = LR1Table(grammar, first_calc)
+        phases['table'].append(time.perf_counter() - start)
+        if lr1_table.conflicts:
+            raise ValueError(f"La gramática tiene {len(lr1_table.conflicts)} conflictos LR(1)")
+
+        parser = Parser(grammar, lr1_table)
+        start = time.perf_counter()
+        accepted = sum(1 for text in inputs if parser.parse(text, show_trace=False))
+        phases['parse'].append(time.perf_counter() - start)
+
+        # Todas las entradas son válidas: un rechazo mediría solo el error temprano
+        if accepted != len(inputs):
+            raise ValueError(f"Se aceptaron {accepted} de {len(inputs)} entradas válidas")
+
+    # Memoria pico y contadores en una pasada aparte para no alterar los tiempos
+    stats = Stats()
+    tracemalloc.start()
+    grammar = read_grammar_from_string(grammar_text)
+    first_calc = FirstCalculator(grammar, stats)
+    FollowCalculator(grammar, first_calc, stats)
+    lr1_table = LR1Table(grammar, first_calc, stats=stats)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    num_tokens = sum(len(text.replace(" ", "")) + 1 for text in inputs)
+    parse_time = min(phases['parse'])
+
+    return {
+        'phases': {name: min(times) for name, times in phases.items()},
+        'productions': len(grammar.all_productions),
+        'states': len(lr1_table.states),
+        'peak_memory_bytes': peak,
+        'inputs': len(inputs),
+        'accepted': accepted,
+        'tokens': num_tokens,
+        'tokens_per_sec': num_tokens / parse_time if inputs and parse_time > 0 else None,
+        'counters': stats.counters,
+    }
+
+
+def current_commit() -> str:
+    """Commit actual del repositorio, o None si no se puede obtener"""
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                                capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def compare_results(baseline_file: str, results: List[Dict]):
+    """
+    Imprime la relación de tiempos contra resultados anteriores. Solo se
+    comparan cargas con la misma suite y los mismos parámetros (las gramáticas
+    aleatorias dependen de la suite); las demás se listan como omitidas. Si
+    hay varias coincidencias se usa la última del archivo.
+    """
+    baseline = {}
+    with open(baseline_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                key = (record['workload'], record.get('suite'),
+                       json.dumps(record.get('params'), sort_keys=True))
+                baseline[key] = record
+
+    print("\n" + "=" * 80)
+    print(f"COMPARACIÓN CONTRA {baseline_file}")
+    print("=" * 80)
+    print(f"{'Workload':<16}{'Phase':<10}{'Before (s)':<14}{'After (s)':<14}{'Ratio'}")
+    print("-" * 80)
+    skipped = []
+    for record in results:
+        key = (record['workload'], record['suite'],
+               json.dumps(record['params'], sort_keys=True))
+        old = baseline.get(key)
+        if old is None:
+            skipped.append(record['workload'])
+            continue
+        for phase, seconds in record['phases'].items():
+            before = old['phases'].get(phase)
+            if not before:
+                continue
+            print(f"{record['workload']:<16}{phase:<10}{before:<14.6f}{seconds:<14.6f}"
+                  f"{seconds / before:.2f}x")
+
+    if skipped:
+        print(f"Omitidos (sin resultado anterior con la misma suite y parámetros): "
+              f"{', '.join(skipped)}")
+
+
+def main(argv=None):
+    """Ejecuta la suite de benchmarks"""
+    arg_parser = argparse.ArgumentParser(description="Benchmarks del parser LR(1)")
+    arg_parser.add_argument('--suite', choices=['small', 'default', 'large'], default='default')
+    arg_parser.add_argument('--repeat', type=int, default=3,
+                            help="repeticiones por carga (se reporta el mínimo)")
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--output', help="archivo JSON lines donde agregar los resultados")
+    arg_parser.add_argument('--compare', help="resultados anteriores (JSON lines) para comparar")
+    args = arg_parser.parse_args(argv)
+
+    commit = current_commit()
+    timestamp = time.strftime('%Y-%m-%dT%H:%M:%S')
+    results = []
+
+    print(f"{'Workload':<16}{'States':<8}{'Load':<10}{'FIRST':<10}{'FOLLOW':<10}"
+          f"{'Table':<10}{'Parse':<10}{'Peak KiB':<10}{'Tokens/s'}")
+    print("-" * 100)
+
+    for name, params, grammar_text, inputs in build_workloads(args.suite, args.seed):
+        result = run_workload(grammar_text, inputs, args.repeat)
+        record = {'workload': name, 'suite': args.suite, 'params': params, 'commit': commit,
+                  'timestamp': timestamp, 'python': platform.python_version()}
+        record.update(result)
+        results.append(record)
+
+        phases = result['phases']
+        tokens_per_sec = result['tokens_per_sec']
+        rate = f"{tokens_per_sec:.0f}" if tokens_per_sec else "-"
+        print(f"{name:<16}{result['states']:<8}{phases['load']:<10.4f}{phases['first']:<10.4f}"
+              f"{phases['follow']:<10.4f}{phases['table']:<10.4f}{phases['parse']:<10.4f}"
+              f"{result['peak_memory_bytes'] // 1024:<10}{rate}")
+
+    if args.output:
+        with open(args.output, 'a', encoding='utf-8') as f:
+            for record in results:
+                f.write(json.dumps(record) + '\n')
+
+    if args.compare:
+        compare_results(args.compare, results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,14 +4,21 @@ from typing import Set, List
 class FirstCalculator:
     """Calcula los conjuntos FIRST para una gramática"""
 
-    def __init__(self, grammar):
+    def __init__(self, grammar, stats=None):
         """
         Args:
             grammar: objeto Grammar
+            stats: objeto Stats opcional para registrar tiempos y contadores
         """
         self.grammar = grammar
         self.first_sets = {}
-        self._compute()
+        self.stats = stats
+
+        if stats is None:
+            self._compute()
+        else:
+            with stats.phase('first'):
+                self._compute()
 
     def _compute(self):
         """Calcula los conjuntos FIRST para todos los símbolos"""
@@ -24,9 +31,11 @@ class FirstCalculator:
             self.first_sets[non_terminal] = set()
 
         # Iteración hasta punto fijo
+        iterations = 0
         changed = True
         while changed:
             changed = False
+            iterations += 1
             for lhs, rhs in self.grammar.all_productions:
                 old_size = len(self.first_sets[lhs])
 
@@ -52,6 +61,9 @@ class FirstCalculator:
                 if len(self.first_sets[lhs]) > old_size:
                     changed = True
 
+        if self.stats is not None:
+            self.stats.add('first.iterations', iterations)
+
     def get_first(self, symbol: str) -> Set[str]:
         """Obtiene FIRST de un símbolo"""
         return self.first_sets.get(symbol, {symbol})
@@ -4,16 +4,23 @@ from typing import Set
 class FollowCalculator:
     """Calcula los conjuntos FOLLOW para una gramática"""
 
-    def __init__(self, grammar, first_calculator):
+    def __init__(self, grammar, first_calculator, stats=None):
         """
         Args:
             grammar: objeto Grammar
             first_calculator: objeto FirstCalculator
+            stats: objeto Stats opcional para registrar tiempos y contadores
         """
         self.grammar = grammar
         self.first_calc = first_calculator
         self.follow_sets = {}
-        self._compute()
+        self.stats = stats
+
+        if stats is None:
+            self._compute()
+        else:
+            with stats.phase('follow'):
+                self._compute()
 
     def _compute(self):
         """Calcula los conjuntos FOLLOW para todos los no terminales"""
@@ -25,9 +32,11 @@ class FollowCalculator:
         self.follow_sets[self.grammar.start_symbol].add('$')
 
         # Iteración hasta punto fijo
+        iterations = 0
         changed = True
         while changed:
             changed = False
+            iterations += 1
 
             for lhs, rhs in self.grammar.all_productions:
                 for i, symbol in enumerate(rhs):
@@ -46,6 +55,9 @@ class FollowCalculator:
                         if len(self.follow_sets[symbol]) > old_size:
                             changed = True
 
+        if self.stats is not None:
+            self.stats.add('follow.iterations', iterations)
+
     def get_follow(self, non_terminal: str) -> Set[str]:
         """Obtiene FOLLOW de un no terminal"""
         return self.follow_sets.get(non_terminal, set())
@@ -0,0 +1,233 @@
+# ============================================================================
+# generator.py
+# Generador de oraciones aleatorias a partir de una gramática
+# ============================================================================
+
+import argparse
+import random
+import sys
+from typing import Dict, Iterator, List, Optional
+
+from grammar import read_grammar_from_file
+
+
+INFINITY = float('inf')
+
+
+class SentenceGenerator:
+    """Deriva oraciones aleatorias (válidas o mutadas) de una gramática"""
+
+    def __init__(self, grammar, seed: Optional[int] = None, grow: float = 0.9):
+        """
+        Args:
+            grammar: objeto Grammar
+            seed: semilla del generador aleatorio
+            grow: probabilidad de elegir una producción que alarga la oración
+                  mientras no se alcance la longitud objetivo
+        """
+        self.grammar = grammar
+        self.rng = random.Random(seed)
+        self.grow = grow
+        self.terminals = sorted(grammar.terminals)
+
+        # Producciones por no terminal (sin la producción aumentada)
+        self.rules: Dict[str, List[List[str]]] = {}
+        for lhs, rhs in grammar.all_productions:
+            if lhs != grammar.augmented_start:
+                self.rules.setdefault(lhs, []).append([s for s in rhs if s != 'ε'])
+
+        self.min_length: Dict[str, float] = {}
+        self.shortest: Dict[str, List[str]] = {}
+        # Alternativas de longitud mínima que solo usan no terminales resueltos
+        # antes que el suyo: expandir siempre por alguna de ellas termina
+        self.closing: Dict[str, List[List[str]]] = {}
+        self._compute_min_lengths()
+
+        if self.min_length.get(grammar.start_symbol, INFINITY) == INFINITY:
+            raise ValueError(f"El símbolo inicial '{grammar.start_symbol}' no deriva ninguna cadena")
+
+    def _compute_min_lengths(self):
+        """
+        Calcula la longitud mínima de derivación de cada no terminal (algoritmo
+        de Knuth). La producción que la alcanza solo usa no terminales ya
+        resueltos, así que expandir siempre por ella termina.
+        """
+        for non_terminal in self.rules:
+            self.min_length[non_terminal] = INFINITY
+
+        rank: Dict[str, int] = {}
+        pending = set(self.rules)
+        while pending:
+            best_symbol, best_rhs, best_length = None, None, INFINITY
+            for non_terminal in pending:
+                for rhs in self.rules[non_terminal]:
+                    if any(s in pending for s in rhs):
+                        continue
+                    length = self._rhs_min_length(rhs)
+                    if length < best_length:
+                        best_symbol, best_rhs, best_length = non_terminal, rhs, length
+
+            if best_symbol is None:
+                # Los no terminales restantes no son productivos
+                break
+
+            self.min_length[best_symbol] = best_length
+            self.shortest[best_symbol] = best_rhs
+            rank[best_symbol] = len(rank)
+            pending.discard(best_symbol)
+
+        for non_terminal, order in rank.items():
+            self.closing[non_terminal] = [
+                rhs for rhs in self.rules[non_terminal]
+                if self._rhs_min_length(rhs) == self.min_length[non_terminal]
+                and all(rank.get(s, -1) < order for s in rhs)]
+
+    def _rhs_min_length(self, rhs: List[str]) -> float:
+        """Longitud mínima de la cadena terminal derivada de rhs"""
+        return sum(self.min_length.get(s, 1) for s in rhs)
+
+    def generate(self, target_length: int = 20, max_depth: Optional[int] = None) -> Iterator[str]:
+        """
+        Genera una oración válida, terminal por terminal.
+
+        La longitud es aproximada: mientras quede presupuesto se eligen al azar
+        producciones que caben en él (todas las alternativas, incluidas las de
+        longitud mínima, pueden salir); después, al azar entre las de longitud
+        mínima que terminan (self.closing).
+
+        Args:
+            target_length: longitud objetivo de la oración en terminales
+            max_depth: profundidad máxima de derivación antes de cerrar con
+                       las producciones mínimas (None = target_length más la
+                       cantidad de no terminales, para cortar ciclos entre
+                       alternativas que no alargan la oración)
+        """
+        if max_depth is None:
+            max_depth = target_length + len(self.rules)
+
+        start = self.grammar.start_symbol
+        # Presupuesto restante descontando lo mínimo que falta por emitir
+        remaining = target_length - self.min_length[start]
+        stack = [(start, 0)]
+
+        while stack:
+            symbol, depth = stack.pop()
+
+            if symbol not in self.rules:
+                yield symbol
+                continue
+
+            if remaining > 0 and depth < max_depth:
+                # Con probabilidad `grow` una que alarga la oración y quepa en
+                # el presupuesto; si no, cualquiera que no la alargue
+                base = self.min_length[symbol]
+                growing, level = [], []
+                for option in self.rules[symbol]:
+                    extra = self._rhs_min_length(option) - base
+                    if extra == 0:
+                        level.append(option)
+                    elif extra <= remaining:
+                        growing.append((option, extra))
+
+                if growing and self.rng.random() < self.grow:
+                    rhs, extra = self.rng.choice(growing)
+                    remaining -= extra
+                else:
+                    rhs = self.rng.choice(level)
+            else:
+                rhs = self.rng.choice(self.closing[symbol])
+
+            for child in reversed(rhs):
+                stack.append((child, depth + 1))
+
+    def mutate(self, tokens: Iterator[str], rate: float = 0.05) -> Iterator[str]:
+        """
+        Aplica mutaciones (borrar, duplicar, reemplazar o insertar un terminal)
+        a una secuencia de terminales. Se garantiza al menos una mutación,
+        aunque la oración resultante podría seguir siendo válida.
+        """
+        mutated = False
+        for token in tokens:
+            if self.rng.random() >= rate:
+                yield token
+                continue
+
+            mutated = True
+            kind = self.rng.randrange(4)
+            if kind == 0:
+                continue
+            elif kind == 1:
+                yield token
+                yield token
+            elif kind == 2:
+                yield self.rng.choice(self.terminals)
+            else:
+                yield self.rng.choice(self.terminals)
+                yield token
+
+        if not mutated and self.terminals:
+            yield self.rng.choice(self.terminals)
+
+    def write_corpus(self, out, count: int, target_length: int = 20,
+                     max_depth: Optional[int] = None, invalid_ratio: float = 0.0,
+                     mutation_rate: float = 0.05, sep: str = ''):
+        """
+        Escribe `count` oraciones, una por línea, sin acumularlas en memoria.
+
+        Args:
+            out: stream de texto de salida
+            count: número de oraciones
+            target_length: longitud objetivo de cada oración
+            max_depth: profundidad máxima de derivación
+            invalid_ratio: fracción de oraciones mutadas
+            mutation_rate: probabilidad de mutar cada terminal
+            sep: separador entre terminales
+        """
+        chunk = []
+        for _ in range(count):
+            tokens = self.generate(target_length, max_depth)
+            if self.rng.random() < invalid_ratio:
+                tokens = self.mutate(tokens, mutation_rate)
+
+            first = True
+            for token in tokens:
+                if not first and sep:
+                    chunk.append(sep)
+                chunk.append(token)
+                first = False
+                if len(chunk) >= 4096:
+                    out.write(''.join(chunk))
+                    chunk.clear()
+            chunk.append('\n')
+
+        out.write(''.join(chunk))
+
+
+def main(argv=None):
+    """Genera un corpus de oraciones para una gramática"""
+    arg_parser = argparse.ArgumentParser(description="Generador de oraciones aleatorias")
+    arg_parser.add_argument('grammar', help="archivo de gramática")
+    arg_parser.add_argument('-n', '--count', type=int, default=10)
+    arg_parser.add_argument('--length', type=int, default=20, help="longitud objetivo")
+    arg_parser.add_argument('--max-depth', type=int, default=None)
+    arg_parser.add_argument('--invalid', type=float, default=0.0,
+                            help="fracción de oraciones mutadas")
+    arg_parser.add_argument('--mutation-rate', type=float, default=0.05)
+    arg_parser.add_argument('--seed', type=int, default=None)
+    arg_parser.add_argument('--sep', default='', help="separador entre terminales")
+    arg_parser.add_argument('-o', '--output', help="archivo de salida (por defecto stdout)")
+    args = arg_parser.parse_args(argv)
+
+    generator = SentenceGenerator(read_grammar_from_file(args.grammar), seed=args.seed)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as out:
+            generator.write_corpus(out, args.count, args.length, args.max_depth,
+                                   args.invalid, args.mutation_rate, args.sep)
+    else:
+        generator.write_corpus(sys.stdout, args.count, args.length, args.max_depth,
+                               args.invalid, args.mutation_rate, args.sep)
+
+
+if __name__ == "__main__":
+    main()
@@ -83,29 +83,47 @@ def read_grammar_from_file(filename: str) -> Grammar:
     Args:
         filename: ruta del archivo
 
+    Returns:
+        Grammar: objeto Grammar construido
+    """
+    with open(filename, 'r', encoding='utf-8') as f:
+        return read_grammar_from_lines(f)
+
+
+def read_grammar_from_string(text: str) -> Grammar:
+    """Lee una gramática desde un texto con el mismo formato que los archivos"""
+    return read_grammar_from_lines(text.splitlines())
+
+
+def read_grammar_from_lines(lines) -> Grammar:
+    """
+    Construye una gramática a partir de líneas de texto.
+
+    Args:
+        lines: iterable de líneas con el formato de read_grammar_from_file
+
     Returns:
         Grammar: objeto Grammar construido
     """
     productions = defaultdict(list)
     start_symbol = None
 
-    with open(filename, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith('#'):
-                continue
-
-            parts = line.split('->')
-            if len(parts) != 2:
-                continue
-
-            lhs = parts[0].strip()
-            if start_symbol is None:
-                start_symbol = lhs
-
-            rhs_alternatives = parts[1].split('|')
-            for rhs in rhs_alternatives:
-                symbols = rhs.strip().split()
-                productions[lhs].append(symbols)
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        parts = line.split('->')
+        if len(parts) != 2:
+            continue
+
+        lhs = parts[0].strip()
+        if start_symbol is None:
+            start_symbol = lhs
+
+        rhs_alternatives = parts[1].split('|')
+        for rhs in rhs_alternatives:
+            symbols = rhs.strip().split()
+            productions[lhs].append(symbols)
 
     return Grammar(dict(productions), start_symbol)
@@ -1,13 +1,187 @@
+import argparse
 from grammar import Grammar, read_grammar_from_file
 from parser import Parser, print_grammar, print_grammar
 from first import FirstCalculator
 from follow import FollowCalculator
 from table import LR1Table, LR1Item
+from stats import Stats
+from report import TableReport
+from parse_trace import TraceRecorder
 from utils import *
+import contextlib
+import json
+import sys
 
-def main():
+REPORTS = ['grammar', 'first', 'follow', 'closure', 'states', 'table']
+
+# Opciones que solo tienen sentido en modo no interactivo: indicar cualquiera
+# de ellas activa ese modo. Las de valor con opciones fijas tienen default None
+# para distinguir si se indicaron y toman su valor por defecto en main()
+BATCH_OPTIONS = ['format', 'report', 'export', 'export_table', 'trace_last', 'recover',
+                 'sync', 'minimize', 'storage']
+
+
+def example_grammar() -> Grammar:
+    """Gramática de ejemplo: S -> C C, C -> c C | d"""
+    return Grammar({
+        'S': [['C', 'C']],
+        'C': [['c', 'C'], ['d']]
+    }, 'S')
+
+
+def main(argv=None):
     """Programa principal del parser LR(1)"""
+    arg_parser = argparse.ArgumentParser(
+        description="Generador y parser LR(1). Sin argumentos funciona en modo interactivo.")
+    arg_parser.add_argument('inputs', nargs='*',
+                            help="archivos con una cadena por línea ('-' para stdin)")
+    arg_parser.add_argument('-g', '--grammar',
+                            help="archivo de gramática (por defecto, la de ejemplo)")
+    arg_parser.add_argument('-b', '--batch', action='store_true',
+                            help="modo no interactivo aunque no se indiquen archivos")
+    arg_parser.add_argument('-f', '--format', choices=['text', 'jsonl'],
+                            help="formato de los resultados (por defecto, text)")
+    arg_parser.add_argument('-r', '--report', action='append', choices=REPORTS + ['all'],
+                            default=[], help="reporte a mostrar en stderr (repetible)")
+    arg_parser.add_argument('--export', metavar='FILE',
+                            help="exporta la tabla a .csv, .md o .html")
+    arg_parser.add_argument('--export-table', choices=['action', 'closure'],
+                            help="tabla a exportar con --export (por defecto, action)")
+    arg_parser.add_argument('--trace-last', type=int, metavar='N',
+                            help="muestra en stderr los últimos N pasos de cada cadena rechazada")
+    arg_parser.add_argument('--recover', action='store_true',
+                            help="continúa tras los errores y los reporta todos")
+    arg_parser.add_argument('--sync', metavar='TERMINALES',
+                            help="terminales de sincronización para --recover (ej. ';}')")
+    arg_parser.add_argument('--minimize', action='store_true',
+                            help="fusiona los estados equivalentes de la tabla")
+    arg_parser.add_argument('--storage', choices=LR1Table.STORAGE_MODES,
+                            help="items de los estados que se conservan tras construir la "
+                                 "tabla (por defecto, full)")
+    arg_parser.add_argument('--stats', action='store_true',
+                            help="muestra tiempos por fase y contadores")
+    args = arg_parser.parse_args(argv)
+    stats = Stats() if args.stats else None
+
+    batch_options = any(getattr(args, name) not in (None, False, []) for name in BATCH_OPTIONS)
+    args.format = args.format or 'text'
+    args.export_table = args.export_table or 'action'
+    args.storage = args.storage or 'full'
+
+    if args.batch or args.grammar or args.inputs or batch_options:
+        return run_batch(args, stats)
+
+    interactive(stats)
+    return 0
+
+
+def run_batch(args, stats) -> int:
+    """
+    Modo no interactivo: parsea cada línea de las entradas y escribe un
+    resultado por línea en stdout. Los reportes y estadísticas van a stderr.
+
+    Returns:
+        int: 0 si todas las cadenas son aceptadas, 1 si alguna es rechazada,
+             2 si no se pudo cargar la gramática, exportar la tabla o leer
+             una entrada (archivo inexistente o con texto que no es UTF-8)
+    """
+    try:
+        grammar = read_grammar_from_file(args.grammar) if args.grammar else example_grammar()
+    except OSError as e:
+        print(f"Error: No se pudo leer el archivo '{args.grammar}': {e}", file=sys.stderr)
+        return 2
+    except Exception as e:
+        print(f"Error al leer la gramática: {e}", file=sys.stderr)
+        return 2
+
+    reports = set(REPORTS) if 'all' in args.report else set(args.report)
+    if args.storage == 'none' and (reports & {'closure', 'states'} or
+                                   (args.export and args.export_table == 'closure')):
+        print("Error: los reportes de estados requieren --storage full o kernel", file=sys.stderr)
+        return 2
+
+    with contextlib.redirect_stdout(sys.stderr):
+        if 'grammar' in reports:
+            print_grammar(grammar)
+
+        first_calc = FirstCalculator(grammar, stats)
+        if 'first' in reports:
+            first_calc.print_sets()
+
+        if 'follow' in reports or stats is not None:
+            follow_calc = FollowCalculator(grammar, first_calc, stats)
+            if 'follow' in reports:
+                follow_calc.print_sets()
+
+        lr1_table = LR1Table(grammar, first_calc, minimize=args.minimize, stats=stats,
+                             storage=args.storage)
+        if 'closure' in reports:
+            lr1_table.print_closure_table()
+        if 'states' in reports:
+            lr1_table.print_states()
+        if 'table' in reports:
+            lr1_table.print_action_goto_tables()
 
+    if args.export:
+        try:
+            TableReport(lr1_table).export(args.export, table=args.export_table)
+        except (OSError, ValueError) as e:
+            print(f"Error al exportar la tabla: {e}", file=sys.stderr)
+            return 2
+
+    parser = Parser(grammar, lr1_table, stats)
+    trace = TraceRecorder(args.trace_last) if args.trace_last else None
+    out = sys.stdout
+    all_accepted = True
+
+    for source in args.inputs or ['-']:
+        try:
+            if source == '-':
+                lines = sys.stdin
+                handle = contextlib.nullcontext()
+            else:
+                handle = open(source, 'r', encoding='utf-8')
+                lines = handle
+
+            with handle:
+                for line_number, line in enumerate(lines, 1):
+                    input_string = line.rstrip('\r\n')
+                    accepted = parser.parse(input_string, show_trace=False, trace=trace,
+                                            recover=args.recover, sync_tokens=args.sync)
+                    all_accepted = all_accepted and accepted
+
+                    if trace is not None and not accepted:
+                        print(f"{source}:{line_number}: últimos pasos antes del error",
+                              file=sys.stderr)
+                        trace.render(grammar, sys.stderr)
+
+                    if args.format == 'jsonl':
+                        out.write(json.dumps({'source': source, 'line': line_number,
+                                              'input': input_string, 'accepted': accepted,
+                                              'errors': parser.errors},
+                                             ensure_ascii=False) + '\n')
+                    elif args.recover and parser.errors:
+                        positions = ' '.join(f"{error['position']}:{error['token']}"
+                                             for error in parser.errors)
+                        out.write(f"RECHAZADA\t{input_string}\t{positions}\n")
+                    else:
+                        status = 'ACEPTADA' if accepted else 'RECHAZADA'
+                        out.write(f"{status}\t{input_string}\n")
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"Error: No se pudo leer el archivo '{source}': {e}", file=sys.stderr)
+            return 2
+
+    out.flush()
+
+    if stats is not None:
+        with contextlib.redirect_stdout(sys.stderr):
+            stats.print_stats()
+
+    return 0 if all_accepted else 1
+
+
+def interactive(stats):
+    """Modo interactivo: pide la gramática y las cadenas por consola"""
     print_header("GENERADOR Y PARSER LR(1)")
 
     print("\n¿Cómo desea cargar la gramática?")
@@ -18,10 +192,7 @@ def main():
 
     if choice == '1':
         # Gramática de ejemplo
-        grammar = Grammar({
-            'S': [['C', 'C']],
-            'C': [['c', 'C'], ['d']]
-        }, 'S')
+        grammar = example_grammar()
 
     elif choice == '2':
         filename = input("Ingrese el nombre del archivo de gramática: ").strip()
@@ -42,17 +213,17 @@ def main():
 
     # Calcular FIRST
     print("\nCalculando conjuntos FIRST...")
-    first_calc = FirstCalculator(grammar)
+    first_calc = FirstCalculator(grammar, stats)
     first_calc.print_sets()
 
     # Calcular FOLLOW (opcional)
     print("\nCalculando conjuntos FOLLOW...")
-    follow_calc = FollowCalculator(grammar, first_calc)
+    follow_calc = FollowCalculator(grammar, first_calc, stats)
     follow_calc.print_sets()
 
     # Construir tabla LR(1)
     print("\nConstruyendo tabla LR(1)...")
-    lr1_table = LR1Table(grammar, first_calc)
+    lr1_table = LR1Table(grammar, first_calc, stats=stats)
 
     # Mostrar closure table
     lr1_table.print_closure_table()
@@ -63,8 +234,11 @@ def main():
     # Mostrar tablas ACTION y GOTO
     lr1_table.print_action_goto_tables()
 
+    if stats is not None:
+        stats.print_stats()
+
     # Crear parser
-    parser = Parser(grammar, lr1_table)
+    parser = Parser(grammar, lr1_table, stats)
 
     # Parsear entrada
     while True:
@@ -76,8 +250,15 @@ def main():
 
         parser.parse(input_string)
 
+        if stats is not None:
+            print(f"Shifts: {stats.last_parse['shifts']}, "
+                  f"Reduces: {stats.last_parse['reduces']}")
+
+    if stats is not None:
+        stats.print_stats()
+
     print("\n¡Gracias por usar el parser LR(1)!")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,145 @@
+# ============================================================================
+# parse_trace.py
+# Registro compacto de los pasos del parsing con renderizado bajo demanda
+# ============================================================================
+
+import sys
+from collections import deque
+from typing import Iterator, List, Optional, Tuple
+
+
+# Cantidad de tokens de entrada mostrados por fila cuando la traza es parcial
+# o la entrada es larga
+PARTIAL_INPUT_WIDTH = 20
+
+# Entradas de hasta esta cantidad de tokens se muestran completas, con la pila
+# y el resto de la entrada en cada fila; con más tokens eso crece de forma
+# cuadrática y se recortan ambas columnas
+FULL_TRACE_TOKENS = 200
+
+# Elementos del tope de la pila mostrados cuando se recorta
+CLIPPED_STACK_ENTRIES = 16
+
+
+class TraceRecorder:
+    """
+    Guarda cada paso del parsing como una tupla (estado, posición, acción).
+
+    Con `capacity` se conservan solo los últimos pasos (buffer circular), por
+    ejemplo los previos a un error. Las acciones son:
+        ('s', estado)                  desplazamiento
+        ('r', producción, estado)      reducción y estado del GOTO
+        ('acc',)                       aceptación
+        ('err', mensaje)               error
+        ('rec', altura, posición, no terminal, estado)
+                                       recuperación: la pila se corta a esa
+                                       altura, se apila el no terminal asumido
+                                       (si no es None) y se continúa en esa
+                                       posición con ese estado en el tope
+    """
+
+    def __init__(self, capacity: Optional[int] = None):
+        """
+        Args:
+            capacity: número máximo de pasos guardados (None = todos)
+        """
+        self.capacity = capacity
+        self.steps = deque(maxlen=capacity)
+        self.total = 0
+        self.tokens: List[str] = []
+
+    def begin(self, tokens: List[str]):
+        """Reinicia el registro para una nueva entrada"""
+        self.steps.clear()
+        self.total = 0
+        self.tokens = tokens
+
+    def record(self, state: int, position: int, action: Tuple):
+        """Registra un paso"""
+        self.steps.append((state, position, action))
+        self.total += 1
+
+    @property
+    def dropped(self) -> int:
+        """Pasos descartados por el buffer circular"""
+        return self.total - len(self.steps)
+
+    def _action_str(self, grammar, action: Tuple) -> str:
+        """Texto de la columna Action"""
+        kind = action[0]
+        if kind == 's':
+            return f"Shift {action[1]}"
+        elif kind == 'r':
+            lhs, rhs = grammar.all_productions[action[1]]
+            rhs_str = ' '.join(rhs) if rhs else 'ε'
+            return f"Reduce {action[1]}: {lhs} -> {rhs_str}"
+        elif kind == 'acc':
+            return "Accept"
+        elif kind == 'rec':
+            if action[3] is not None:
+                return f"Recuperación: se asume {action[3]}, continúa en posición {action[2]}"
+            return f"Recuperación: estado {action[4]}, continúa en posición {action[2]}"
+        return f"ERROR: {action[1]}"
+
+    def rows(self, grammar) -> Iterator[Tuple[int, str, str, str]]:
+        """
+        Genera las filas (paso, pila, entrada, acción).
+
+        Si la traza está completa se reconstruye la pila reproduciendo las
+        acciones desde el estado 0. Si el buffer descartó pasos, la pila se
+        muestra solo con su estado superior y la entrada se recorta.
+
+        El formato completo (toda la pila y todo el resto de la entrada) solo
+        se conserva con entradas de hasta FULL_TRACE_TOKENS tokens. Con
+        entradas más largas la pila se recorta a sus últimos
+        CLIPPED_STACK_ENTRIES elementos y la entrada a PARTIAL_INPUT_WIDTH
+        tokens, para que cada fila tenga tamaño acotado.
+        """
+        complete = self.dropped == 0
+        clip = len(self.tokens) > FULL_TRACE_TOKENS
+        stack = [0]
+        step = self.dropped + 1
+
+        for state, position, action in self.steps:
+            if complete and not clip:
+                stack_str = " ".join(str(s) for s in stack)
+                input_str = "".join(self.tokens[position:])
+            else:
+                if not complete:
+                    stack_str = f"... {state}"
+                elif len(stack) > CLIPPED_STACK_ENTRIES:
+                    stack_str = "... " + " ".join(str(s) for s in stack[-CLIPPED_STACK_ENTRIES:])
+                else:
+                    stack_str = " ".join(str(s) for s in stack)
+                end = position + PARTIAL_INPUT_WIDTH
+                input_str = "".join(self.tokens[position:end])
+                if end < len(self.tokens):
+                    input_str += "..."
+
+            yield step, stack_str, input_str, self._action_str(grammar, action)
+            step += 1
+
+            if complete and action[0] == 's':
+                stack.append(self.tokens[position])
+                stack.append(action[1])
+            elif complete and action[0] == 'r':
+                lhs, rhs = grammar.all_productions[action[1]]
+                del stack[max(0, len(stack) - 2 * len(rhs)):]
+                stack.append(lhs)
+                stack.append(action[2])
+            elif complete and action[0] == 'rec':
+                del stack[action[1]:]
+                if action[3] is not None:
+                    stack.append(action[3])
+                    stack.append(action[4])
+
+    def render(self, grammar, out=None):
+        """Escribe las filas de la traza con el formato de Parser.parse"""
+        out = out or sys.stdout
+        buffer = []
+        for step, stack_str, input_str, action_str in self.rows(grammar):
+            buffer.append(f"{step:<6}{stack_str:<30}{input_str:<20}{action_str}\n")
+            if len(buffer) >= 1024:
+                out.write(''.join(buffer))
+                buffer.clear()
+        out.write(''.join(buffer))
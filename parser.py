@@ -1,130 +1,272 @@
+import sys
 from typing import List
 
+from parse_trace import TraceRecorder
+
 
 class Parser:
     """Parser LR(1) que analiza cadenas de entrada"""
 
-    def __init__(self, grammar, lr1_table):
+    def __init__(self, grammar, lr1_table, stats=None):
         """
         Args:
             grammar: objeto Grammar
             lr1_table: objeto LR1Table
+            stats: objeto Stats opcional para registrar contadores de parsing
         """
         self.grammar = grammar
         self.table = lr1_table
+        self.stats = stats
+        self.errors = []
 
-    def parse(self, input_string: str, show_trace: bool = True) -> bool:
+    def parse(self, input_string: str, show_trace: bool = True, trace=None,
+              recover: bool = False, sync_tokens=None) -> bool:
         """
         Parsea una cadena de entrada
 
         Args:
             input_string: cadena a parsear (sin $)
             show_trace: si se muestra la traza del parsing
+            trace: TraceRecorder opcional donde registrar los pasos (por
+                   ejemplo, con capacidad limitada para ver los últimos
+                   pasos antes de un error)
+            recover: si se continúa tras un error (modo pánico) para
+                     reportar todos los errores en una sola pasada
+            sync_tokens: terminales de sincronización del modo pánico
+                         (por defecto, cualquier terminal)
 
         Returns:
-            bool: True si la cadena es aceptada, False en caso contrario
+            bool: True si la cadena es aceptada, False en caso contrario.
+                  Los errores encontrados quedan en self.errors.
         """
         tokens = list(input_string.replace(" ", "")) + ['$']
         stack = [0]
         input_pos = 0
         step = 1
-        derivations = []
-
-        if show_trace:
-            print("\n" + "=" * 100)
-            print("TRAZA DEL PARSING")
-            print("=" * 100)
-            print(f"{'Step':<6}{'Stack':<30}{'Input':<20}{'Action':<44}")
-            print("-" * 100)
+        shifts = 0
+        reduces = 0
+        accepted = False
+        self.errors = []
+
+        sync = set(sync_tokens) if sync_tokens else None
+        # Como en yacc, tras una recuperación los errores no se reportan
+        # hasta desplazar 3 tokens (se descarta el token erróneo)
+        quiet = 0
+
+        # Reducciones seguidas sin desplazar: en una gramática sin ciclos
+        # (A =>+ A) están acotadas según la altura de la pila al desplazar,
+        # la cantidad de producciones y la longitud máxima de sus lados derechos
+        reduce_factor = len(self.grammar.all_productions) * \
+            (max(len(rhs) for _, rhs in self.grammar.all_productions) + 1)
+        reduces_since_shift = 0
+        reduce_limit = reduce_factor
+
+        if show_trace and trace is None:
+            trace = TraceRecorder()
+        if trace is not None:
+            trace.begin(tokens)
 
         while True:
             current_state = stack[-1]
             current_token = tokens[input_pos]
+            row = self.table.action_table.get(current_state)
+            error = None
 
-            if show_trace:
-                stack_str = " ".join(str(s) for s in stack)
-                input_str = "".join(tokens[input_pos:])
-                print(f"{step:<6}{stack_str:<30}{input_str:<20}", end="")
+            if row is None:
+                # Verificar estado válido
+                error = "Estado inválido"
 
-            # Verificar estado válido
-            if current_state not in self.table.action_table:
-                if show_trace:
-                    print("ERROR: Estado inválido")
-                return False
+            elif current_token not in row:
+                # Verificar token esperado
+                error = f"Token inesperado '{current_token}'"
 
-            # Verificar token esperado
-            if current_token not in self.table.action_table[current_state]:
-                if show_trace:
-                    print(f"ERROR: Token inesperado '{current_token}'")
-                return False
+            else:
+                action = row[current_token]
 
-            action = self.table.action_table[current_state][current_token]
+                if isinstance(action, tuple) and action[0] == 's':
+                    # SHIFT
+                    next_state = action[1]
+                    stack.append(current_token)
+                    stack.append(next_state)
+                    shifts += 1
+                    reduces_since_shift = 0
+                    reduce_limit = (len(stack) // 2 + 1) * reduce_factor
+                    if quiet:
+                        quiet -= 1
+
+                    if trace is not None:
+                        trace.record(current_state, input_pos, action)
+
+                    input_pos += 1
+                    step += 1
+                    continue
+
+                elif isinstance(action, tuple) and action[0] == 'r':
+                    # REDUCE
+                    prod_num = action[1]
+                    lhs, rhs = self.grammar.all_productions[prod_num]
+
+                    # Pop 2 * len(rhs) elementos
+                    for _ in range(len(rhs) * 2):
+                        if stack:
+                            stack.pop()
+
+                    # Consultar GOTO
+                    goto_state = stack[-1] if stack else 0
+                    if lhs not in self.table.goto_table[goto_state]:
+                        error = "GOTO inválido"
+                    else:
+                        next_state = self.table.goto_table[goto_state][lhs]
+                        stack.append(lhs)
+                        stack.append(next_state)
+                        reduces += 1
+                        reduces_since_shift += 1
+
+                        if trace is not None:
+                            trace.record(current_state, input_pos, ('r', prod_num, next_state))
+
+                        step += 1
+                        if reduces_since_shift <= reduce_limit:
+                            continue
+
+                        # Ciclo de reducciones: no hay recuperación posible
+                        if trace is not None:
+                            trace.record(stack[-1], input_pos,
+                                         ('err', "Ciclo de reducciones sin consumir entrada"))
+                        self.errors.append({'position': input_pos, 'token': current_token,
+                                            'expected': []})
+                        break
+
+                elif action == 'acc':
+                    # ACCEPT
+                    if trace is not None:
+                        trace.record(current_state, input_pos, ('acc',))
+                    accepted = not self.errors
+                    break
 
-            if isinstance(action, tuple) and action[0] == 's':
-                # SHIFT
-                next_state = action[1]
-                stack.append(current_token)
-                stack.append(next_state)
-                input_pos += 1
+                else:
+                    error = "Acción desconocida"
+
+            # ERROR
+            if trace is not None:
+                trace.record(current_state, input_pos, ('err', error))
+
+            if not quiet:
+                self.errors.append({'position': input_pos, 'token': current_token,
+                                    'expected': sorted(row) if row else []})
+
+            if not recover:
+                break
+
+            error_pos = input_pos
+            recovery = self._recover(stack, tokens, input_pos, sync, quiet > 0)
+            if recovery is None:
+                break
+
+            input_pos, non_term = recovery
+            quiet = 3
+            reduces_since_shift = 0
+            reduce_limit = (len(stack) // 2 + 1) * reduce_factor
+            if trace is not None:
+                kept = len(stack) - 2 if non_term is not None else len(stack)
+                trace.record(current_state, error_pos,
+                             ('rec', kept, input_pos, non_term, stack[-1]))
+            step += 1
 
-                if show_trace:
-                    print(f"Shift {next_state}")
+        if show_trace:
+            self._print_trace(trace, accepted, recover)
 
-                step += 1
+        if self.stats is not None:
+            self.stats.record_parse(shifts, reduces, step, accepted, len(self.errors))
 
-            elif isinstance(action, tuple) and action[0] == 'r':
-                # REDUCE
-                prod_num = action[1]
-                lhs, rhs = self.grammar.all_productions[prod_num]
+        return accepted
 
-                # Pop 2 * len(rhs) elementos
-                for _ in range(len(rhs) * 2):
-                    if stack:
-                        stack.pop()
+    def _recover(self, stack: list, tokens: List[str], input_pos: int, sync,
+                 skip_current: bool):
+        """
+        Recuperación en modo pánico: se descartan tokens hasta uno de
+        sincronización y se busca, desde el tope de la pila, un estado que
+        acepte ese token o que tenga un GOTO sobre un no terminal A cuyo
+        estado destino lo acepte. En el segundo caso se asume que A terminó
+        y se apilan A y GOTO(estado, A).
 
-                # Consultar GOTO
-                current_state = stack[-1] if stack else 0
-                if lhs in self.table.goto_table[current_state]:
-                    next_state = self.table.goto_table[current_state][lhs]
-                    stack.append(lhs)
-                    stack.append(next_state)
+        Args:
+            stack: pila del parser (se modifica)
+            tokens: tokens de entrada con '$' al final
+            input_pos: posición del token erróneo
+            sync: terminales de sincronización (None = cualquiera)
+            skip_current: si se descarta el token actual (error poco
+                          después de otra recuperación)
 
-                    rhs_str = ' '.join(rhs) if rhs else 'ε'
-                    derivation = f"{lhs} -> {rhs_str}"
-                    derivations.append(derivation)
+        Returns:
+            (posición desde la que continuar, no terminal asumido o None),
+            o None si no es posible recuperarse
+        """
+        recovery = self.table.recovery_actions()
 
-                    if show_trace:
-                        print(f"Reduce {prod_num}: {derivation}")
-                else:
-                    if show_trace:
-                        print("ERROR: GOTO inválido")
-                    return False
-
-                step += 1
-
-            elif action == 'acc':
-                # ACCEPT
-                if show_trace:
-                    print("Accept")
-                    print("-" * 100)
-                    print("✓ CADENA ACEPTADA")
-                    print("\nDerivaciones aplicadas:")
-                    for i, deriv in enumerate(derivations, 1):
-                        print(f"  {i}. {deriv}")
-                    print("=" * 100)
-                return True
+        if skip_current:
+            if tokens[input_pos] == '$':
+                return None
+            input_pos += 1
 
-            else:
-                if show_trace:
-                    print(f"ERROR: Acción desconocida")
-                return False
+        # Profundidad del estado más alto que acepta cada terminal. La pila se
+        # recorre una sola vez, a medida que lo piden los tokens candidatos
+        found = {}
+        # Los estados ocupan las posiciones pares de la pila
+        depth = len(stack) - 1
 
-            if step > 1000:  # Límite de seguridad
-                if show_trace:
-                    print("ERROR: Demasiados pasos")
-                return False
+        while True:
+            token = tokens[input_pos]
+
+            if sync is None or token in sync or token == '$':
+                while token not in found and depth >= 0:
+                    for terminal in recovery.get(stack[depth], ()):
+                        found.setdefault(terminal, depth)
+                    depth -= 2
+
+                if token in found:
+                    depth = found[token]
+                    state = stack[depth]
+                    non_term = recovery[state][token]
+                    del stack[depth + 1:]
+                    if non_term is not None:
+                        stack.append(non_term)
+                        stack.append(self.table.goto_table[state][non_term])
+                    return input_pos, non_term
+
+                if token == '$':
+                    return None
+
+            input_pos += 1
+
+    def _print_trace(self, trace, accepted: bool, recover: bool):
+        """Imprime la traza registrada y, si se aceptó, las derivaciones"""
+        print("\n" + "=" * 100)
+        print("TRAZA DEL PARSING")
+        print("=" * 100)
+        print(f"{'Step':<6}{'Stack':<30}{'Input':<20}{'Action':<44}")
+        print("-" * 100)
+        trace.render(self.grammar, sys.stdout)
+
+        if recover and self.errors:
+            print("-" * 100)
+            print(f"✗ {len(self.errors)} error(es) de sintaxis:")
+            for error in self.errors:
+                expected = ', '.join(error['expected'])
+                print(f"  Posición {error['position']}: token '{error['token']}' "
+                      f"(se esperaba: {expected})")
+            print("=" * 100)
 
-        return False
+        if accepted:
+            print("-" * 100)
+            print("✓ CADENA ACEPTADA")
+            print("\nDerivaciones aplicadas:")
+            reductions = [action[1] for _, _, action in trace.steps if action[0] == 'r']
+            for i, prod_num in enumerate(reductions, 1):
+                lhs, rhs = self.grammar.all_productions[prod_num]
+                rhs_str = ' '.join(rhs) if rhs else 'ε'
+                print(f"  {i}. {lhs} -> {rhs_str}")
+            print("=" * 100)
 
 
 # ============================================================================
@@ -0,0 +1,222 @@
+# ============================================================================
+# registry.py
+# Caché en proceso de tablas LR(1) para varias gramáticas con desalojo LRU
+# ============================================================================
+
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, Optional
+
+from first import FirstCalculator
+from table import LR1Table
+from parser import Parser
+
+
+def grammar_key(grammar) -> str:
+    """
+    Hash normalizado de una gramática: depende solo del símbolo inicial y de
+    las producciones en orden, no del formato del archivo (espacios,
+    comentarios o alternativas con |).
+    """
+    normalized = [grammar.start_symbol,
+                  [[lhs, list(rhs)] for lhs, rhs in grammar.all_productions]]
+    text = json.dumps(normalized, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def estimate_table_size(lr1_table) -> int:
+    """Tamaño aproximado en bytes de las tablas ACTION/GOTO y las transiciones"""
+    size = sys.getsizeof(lr1_table.action_table) + sys.getsizeof(lr1_table.goto_table)
+    for row in lr1_table.action_table.values():
+        size += sys.getsizeof(row)
+    for row in lr1_table.goto_table.values():
+        size += sys.getsizeof(row)
+    size += sys.getsizeof(lr1_table.state_transitions)
+    return size
+
+
+class TableRegistry:
+    """
+    Registro de tablas LR(1) indexado por grammar_key().
+
+    Las tablas se construyen al pedirlas y se desalojan las menos usadas
+    recientemente al superar `max_entries` o `max_bytes`. Si varios hilos
+    piden a la vez la misma gramática, solo uno la construye. Con
+    `cache_dir`, las tablas desalojadas se guardan en disco como JSON y se
+    recargan de ahí en lugar de reconstruirse.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None,
+                 cache_dir: Optional[str] = None, minimize: bool = False):
+        """
+        Args:
+            max_entries: máximo de tablas residentes (None = sin límite)
+            max_bytes: memoria aproximada máxima de las tablas (None = sin límite)
+            cache_dir: directorio para las tablas desalojadas (None = no se guardan)
+            minimize: si se construyen las tablas con estados minimizados
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.minimize = minimize
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()
+        self._building: Dict[str, Future] = {}
+        self.total_bytes = 0
+
+        self.counters = {'hits': 0, 'misses': 0, 'builds': 0,
+                         'disk_loads': 0, 'evictions': 0, 'store_errors': 0,
+                         'load_errors': 0}
+
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, grammar) -> bool:
+        return grammar_key(grammar) in self._entries
+
+    def get(self, grammar) -> LR1Table:
+        """Obtiene (o construye) la tabla LR(1) de una gramática"""
+        key = grammar_key(grammar)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.counters['hits'] += 1
+                return entry[0]
+
+            self.counters['misses'] += 1
+            future = self._building.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._building[key] = future
+
+        if not owner:
+            # Otro hilo ya está construyendo esta tabla
+            return future.result()
+
+        try:
+            lr1_table = self._load(key, grammar)
+            if lr1_table is None:
+                lr1_table = LR1Table(grammar, FirstCalculator(grammar),
+                                     minimize=self.minimize, storage='none')
+                with self._lock:
+                    self.counters['builds'] += 1
+        except BaseException as e:
+            with self._lock:
+                del self._building[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._building[key]
+            size = estimate_table_size(lr1_table)
+            self._entries[key] = (lr1_table, size)
+            self.total_bytes += size
+            evicted = self._evict()
+
+        future.set_result(lr1_table)
+
+        for evicted_key, evicted_table in evicted:
+            self._store(evicted_key, evicted_table)
+
+        return lr1_table
+
+    def get_parser(self, grammar) -> Parser:
+        """Crea un Parser con la tabla registrada de la gramática"""
+        return Parser(grammar, self.get(grammar))
+
+    def clear(self):
+        """Descarta todas las tablas residentes (no las guardadas en disco)"""
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def _over_budget(self) -> bool:
+        """Verifica si se supera alguno de los límites"""
+        if self.max_entries is not None and len(self._entries) > self.max_entries:
+            return True
+        if self.max_bytes is not None and self.total_bytes > self.max_bytes:
+            return True
+        return False
+
+    def _evict(self):
+        """Desaloja las tablas menos usadas recientemente (llamar con el lock tomado)"""
+        evicted = []
+        # La tabla recién agregada se conserva aunque sola supere el límite
+        while len(self._entries) > 1 and self._over_budget():
+            key, (lr1_table, size) = self._entries.popitem(last=False)
+            self.total_bytes -= size
+            self.counters['evictions'] += 1
+            evicted.append((key, lr1_table))
+        return evicted
+
+    def _path(self, key: str) -> str:
+        """Archivo de la tabla serializada"""
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _store(self, key: str, lr1_table: LR1Table):
+        """
+        Guarda una tabla desalojada en disco si aún no está guardada. Si falla
+        la escritura (disco lleno, directorio de solo lectura) la tabla
+        simplemente no se guarda y se cuenta en 'store_errors'.
+        """
+        if self.cache_dir is None:
+            return
+
+        path = self._path(key)
+        if os.path.exists(path):
+            return
+
+        # Escribir en un temporal y renombrar para no dejar archivos a medias
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(lr1_table.to_dict(), f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            with self._lock:
+                self.counters['store_errors'] += 1
+
+    def _load(self, key: str, grammar) -> Optional[LR1Table]:
+        """
+        Carga una tabla guardada en disco, o None si no existe. Un archivo
+        ilegible, corrupto o de otro formato se cuenta en 'load_errors', se
+        borra y se trata como ausente para que la tabla se reconstruya.
+        """
+        if self.cache_dir is None:
+            return None
+
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            lr1_table = LR1Table.from_dict(grammar, data)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            with self._lock:
+                self.counters['load_errors'] += 1
+            return None
+
+        with self._lock:
+            self.counters['disk_loads'] += 1
+        return lr1_table
@@ -0,0 +1,253 @@
+# ============================================================================
+# report.py
+# Reportes de la tabla LR(1) escritos en un único stream con buffer
+# ============================================================================
+
+import csv
+import html
+import os
+import sys
+from typing import Dict, Iterator, List, Tuple
+
+
+# Cantidad de líneas acumuladas antes de escribir en el stream
+FLUSH_LINES = 1024
+
+
+class TableReport:
+    """Genera los reportes de closure, estados y ACTION/GOTO de un LR1Table"""
+
+    def __init__(self, lr1_table):
+        """
+        Args:
+            lr1_table: objeto LR1Table
+        """
+        self.table = lr1_table
+        self.grammar = lr1_table.grammar
+        self._incoming = None
+
+    def incoming(self) -> Dict[int, Tuple[int, str]]:
+        """
+        Índice inverso de transiciones: para cada estado, la primera
+        transición (estado, símbolo) que llega a él.
+        """
+        if self._incoming is None:
+            self._incoming = {}
+            for (from_state, symbol), to_state in self.table.state_transitions.items():
+                if to_state not in self._incoming:
+                    self._incoming[to_state] = (from_state, symbol)
+        return self._incoming
+
+    def _kernel_str(self, state) -> str:
+        """
+        Menor item (como texto) del kernel de un estado. No depende del orden
+        de iteración del frozenset, así que coincide aunque el estado se haya
+        recalculado (storage='kernel').
+        """
+        kernel = [str(item) for item in state
+                  if item.dot > 0 or item.lhs == self.grammar.augmented_start]
+        if not kernel:
+            kernel = [str(item) for item in state]
+        return min(kernel, default="")
+
+    def _columns(self) -> Tuple[List[str], List[str]]:
+        """Terminales (con $) y no terminales de las columnas ACTION y GOTO"""
+        terminals = sorted(self.grammar.terminals) + ['$']
+        non_terminals = sorted([nt for nt in self.grammar.non_terminals
+                                if nt != self.grammar.augmented_start])
+        return terminals, non_terminals
+
+    @staticmethod
+    def _action_str(action) -> str:
+        """Representación de una celda ACTION"""
+        if action == 'acc':
+            return 'acc'
+        elif isinstance(action, tuple):
+            return f"{action[0]}{action[1]}"
+        return ''
+
+    # ------------------------------------------------------------------
+    # Reportes en texto
+    # ------------------------------------------------------------------
+
+    def _write_lines(self, lines: Iterator[str], out=None):
+        """Escribe las líneas en bloques para evitar una escritura por celda"""
+        out = out or sys.stdout
+        buffer = []
+        for line in lines:
+            buffer.append(line)
+            if len(buffer) >= FLUSH_LINES:
+                out.write(''.join(buffer))
+                buffer.clear()
+        out.write(''.join(buffer))
+
+    def closure_table_lines(self) -> Iterator[str]:
+        """Líneas de la tabla de closure con los kernels"""
+        yield "\n" + "=" * 80 + "\n"
+        yield "TABLA LR(1) CLOSURE\n"
+        yield "=" * 80 + "\n"
+        yield f"{'Goto':<20}{'Kernel':<30}{'State':<8}{'Closure'}\n"
+        yield "-" * 80 + "\n"
+
+        incoming = self.incoming()
+        for i, state in enumerate(self.table.states):
+            goto_str = ""
+            if i in incoming:
+                from_state, symbol = incoming[i]
+                goto_str = f"goto({from_state}, {symbol})"
+
+            kernel_str = self._kernel_str(state)
+            prefix = f"{goto_str:<20}{kernel_str:<30}{i:<8}"
+
+            closure_strs = sorted(map(str, state))
+            if not closure_strs:
+                yield prefix
+                continue
+
+            yield prefix + closure_strs[0] + "\n"
+            for closure_str in closure_strs[1:]:
+                yield f"{'':<58}{closure_str}\n"
+
+    def states_lines(self) -> Iterator[str]:
+        """Líneas con todos los estados LR(1)"""
+        yield "\n" + "=" * 80 + "\n"
+        yield "ESTADOS LR(1)\n"
+        yield "=" * 80 + "\n"
+        for i, state in enumerate(self.table.states):
+            yield f"\nEstado {i}:\n"
+            for item_str in sorted(map(str, state)):
+                yield f"  {item_str}\n"
+
+    def action_goto_lines(self) -> Iterator[str]:
+        """Líneas de las tablas ACTION y GOTO"""
+        terminals, non_terminals = self._columns()
+
+        yield "\n" + "=" * 100 + "\n"
+        yield "TABLA LR(1) - ACTION Y GOTO\n"
+        yield "=" * 100 + "\n"
+        yield (f"{'State':<8}" + "ACTION".ljust(len(terminals) * 12) +
+               "GOTO".ljust(len(non_terminals) * 12) + "\n")
+        yield (" " * 8 + "".join(f"{term:<12}" for term in terminals) +
+               "".join(f"{nt:<12}" for nt in non_terminals) + "\n")
+        yield "-" * 100 + "\n"
+
+        for i in range(len(self.table.action_table)):
+            actions = self.table.action_table[i]
+            gotos = self.table.goto_table[i]
+            cells = [f"{i:<8}"]
+            cells.extend(f"{self._action_str(actions.get(term, '')):<12}" for term in terminals)
+            cells.extend(f"{str(gotos.get(nt, '')):<12}" for nt in non_terminals)
+            cells.append("\n")
+            yield "".join(cells)
+
+    def write_closure_table(self, out=None):
+        """Escribe la tabla de closure con los kernels"""
+        self._write_lines(self.closure_table_lines(), out)
+
+    def write_states(self, out=None):
+        """Escribe todos los estados LR(1)"""
+        self._write_lines(self.states_lines(), out)
+
+    def write_action_goto_tables(self, out=None):
+        """Escribe las tablas ACTION y GOTO"""
+        self._write_lines(self.action_goto_lines(), out)
+
+    # ------------------------------------------------------------------
+    # Exportación a CSV, Markdown y HTML
+    # ------------------------------------------------------------------
+
+    def action_goto_rows(self) -> Iterator[List[str]]:
+        """Filas de ACTION/GOTO; la primera es el encabezado"""
+        terminals, non_terminals = self._columns()
+        yield ['State'] + terminals + non_terminals
+
+        for i in range(len(self.table.action_table)):
+            actions = self.table.action_table[i]
+            gotos = self.table.goto_table[i]
+            row = [str(i)]
+            row.extend(self._action_str(actions.get(term, '')) for term in terminals)
+            row.extend(str(gotos.get(nt, '')) for nt in non_terminals)
+            yield row
+
+    def closure_rows(self) -> Iterator[List[str]]:
+        """Filas de la tabla de closure (un item por fila); la primera es el encabezado"""
+        yield ['Goto', 'Kernel', 'State', 'Closure']
+
+        incoming = self.incoming()
+        for i, state in enumerate(self.table.states):
+            goto_str = ""
+            if i in incoming:
+                from_state, symbol = incoming[i]
+                goto_str = f"goto({from_state}, {symbol})"
+
+            first = True
+            for item_str in sorted(map(str, state)):
+                if first:
+                    yield [goto_str, self._kernel_str(state), str(i), item_str]
+                    first = False
+                else:
+                    yield ['', '', '', item_str]
+
+    def export(self, filename: str, fmt: str = None, table: str = 'action'):
+        """
+        Exporta una tabla a un archivo, fila por fila.
+
+        Args:
+            filename: archivo de salida
+            fmt: 'csv', 'md' o 'html' (por defecto, según la extensión)
+            table: 'action' (ACTION/GOTO) o 'closure'
+        """
+        if fmt is None:
+            fmt = os.path.splitext(filename)[1].lstrip('.').lower()
+            fmt = {'markdown': 'md', 'htm': 'html'}.get(fmt, fmt)
+
+        writers = {'csv': self._write_csv, 'md': self._write_markdown,
+                   'html': self._write_html}
+        if fmt not in writers:
+            raise ValueError(f"Formato de exportación desconocido: '{fmt}'")
+
+        if table == 'action':
+            rows = self.action_goto_rows()
+        elif table == 'closure':
+            rows = self.closure_rows()
+        else:
+            raise ValueError(f"Tabla desconocida: '{table}'")
+
+        newline = '' if fmt == 'csv' else None
+        with open(filename, 'w', encoding='utf-8', newline=newline) as out:
+            writers[fmt](rows, out)
+
+    @staticmethod
+    def _write_csv(rows: Iterator[List[str]], out):
+        """Escribe las filas en formato CSV"""
+        writer = csv.writer(out)
+        for row in rows:
+            writer.writerow(row)
+
+    def _write_markdown(self, rows: Iterator[List[str]], out):
+        """Escribe las filas como tabla Markdown"""
+        def line(cells):
+            escaped = [cell.replace('|', '\\|') for cell in cells]
+            return "| " + " | ".join(escaped) + " |\n"
+
+        def lines():
+            header = next(rows)
+            yield line(header)
+            yield "|" + "---|" * len(header) + "\n"
+            for row in rows:
+                yield line(row)
+
+        self._write_lines(lines(), out)
+
+    def _write_html(self, rows: Iterator[List[str]], out):
+        """Escribe las filas como tabla HTML"""
+        def lines():
+            header = next(rows)
+            yield "<table>\n<thead>\n<tr>"
+            yield "".join(f"<th>{html.escape(cell)}</th>" for cell in header)
+            yield "</tr>\n</thead>\n<tbody>\n"
+            for row in rows:
+                yield "<tr>" + "".join(f"<td>{html.escape(cell)}</td>" for cell in row) + "</tr>\n"
+            yield "</tbody>\n</table>\n"
+
+        self._write_lines(lines(), out)
@@ -0,0 +1,316 @@
+# ============================================================================
+# server.py
+# Servicio de parsing asyncio con agrupación de peticiones en procesos
+# ============================================================================
+#
+# Protocolo: una petición JSON por línea y una respuesta JSON por línea.
+#   -> {"id": 1, "grammar": "expr", "input": "a+a"}
+#   <- {"id": 1, "accepted": true, "latency_ms": 0.42}
+#   <- {"id": 2, "error": "Gramática desconocida: 'x'"}
+# "grammar" puede omitirse si el servidor carga una sola gramática. Las
+# respuestas pueden llegar en distinto orden que las peticiones. Una línea
+# más larga que `max_line` se descarta y se responde con "id": null.
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List
+
+from grammar import read_grammar_from_file
+from first import FirstCalculator
+from table import LR1Table
+from parser import Parser
+
+
+# Parsers del proceso actual, construidos una sola vez por _init_worker
+_PARSERS: Dict[str, Parser] = {}
+
+
+def _init_worker(grammar_files: Dict[str, str]):
+    """Carga las gramáticas y construye sus tablas en el proceso actual"""
+    for name, filename in grammar_files.items():
+        grammar = read_grammar_from_file(filename)
+        lr1_table = LR1Table(grammar, FirstCalculator(grammar), storage='none')
+        _PARSERS[name] = Parser(grammar, lr1_table)
+
+
+def _parse_batch(name: str, inputs: List[str]) -> List[bool]:
+    """Parsea un lote de cadenas con la gramática `name`"""
+    parser = _PARSERS[name]
+    return [parser.parse(text, show_trace=False) for text in inputs]
+
+
+class ParseServer:
+    """Servidor de parsing sobre un socket TCP o Unix"""
+
+    def __init__(self, grammar_files: Dict[str, str], workers: int = 2,
+                 batch_size: int = 64, batch_window: float = 0.002,
+                 max_pending: int = 1024, max_line: int = 2 ** 20):
+        """
+        Args:
+            grammar_files: {nombre: archivo de gramática}
+            workers: procesos de parsing (0 = un hilo en este proceso)
+            batch_size: máximo de peticiones por lote
+            batch_window: segundos que se espera para completar un lote
+            max_pending: peticiones en cola antes de dejar de leer sockets
+            max_line: bytes máximos de una petición
+        """
+        self.grammar_files = dict(grammar_files)
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.max_pending = max_pending
+        self.max_line = max_line
+
+        self.queue = None
+        self.executor = None
+        self.server = None
+        self._batcher = None
+        self._in_flight = None
+        self._dispatches = set()
+        self._clients = set()
+
+    async def start(self, host: str = None, port: int = None, path: str = None):
+        """Carga las gramáticas y empieza a escuchar en TCP (host, port) o en un socket Unix"""
+        # Validar las gramáticas antes de abrir el socket
+        _init_worker(self.grammar_files)
+
+        if self.workers > 0:
+            self.executor = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                                initargs=(self.grammar_files,))
+        else:
+            self.executor = ThreadPoolExecutor(1)
+
+        self.queue = asyncio.Queue(self.max_pending)
+        self._in_flight = asyncio.Semaphore(max(1, self.workers) * 2)
+        self._batcher = asyncio.create_task(self._run_batcher())
+
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self._handle_client, path,
+                                                          limit=self.max_line)
+        else:
+            self.server = await asyncio.start_server(self._handle_client, host, port,
+                                                     limit=self.max_line)
+        return self.server
+
+    async def close(self):
+        """Detiene el servidor y los procesos de parsing"""
+        if self.server is not None:
+            self.server.close()
+        for task in list(self._clients):
+            task.cancel()
+        if self._clients:
+            await asyncio.gather(*self._clients, return_exceptions=True)
+        if self.server is not None:
+            await self.server.wait_closed()
+        if self._batcher is not None:
+            self._batcher.cancel()
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+
+    def _resolve_grammar(self, request: Dict) -> str:
+        """Nombre de la gramática de una petición"""
+        name = request.get('grammar')
+        if name is None and len(self.grammar_files) == 1:
+            return next(iter(self.grammar_files))
+        if name is not None and not isinstance(name, str):
+            raise ValueError("'grammar' debe ser una cadena")
+        if name not in self.grammar_files:
+            raise ValueError(f"Gramática desconocida: '{name}'")
+        return name
+
+    @staticmethod
+    async def _read_line(reader):
+        """
+        Lee una línea completa. Si supera el límite del reader se descarta
+        hasta el fin de línea y se devuelve None.
+        """
+        try:
+            return await reader.readuntil(b'\n')
+        except asyncio.IncompleteReadError as e:
+            # Fin de la conexión: última línea sin salto o b''
+            return e.partial
+        except asyncio.LimitOverrunError as e:
+            consumed = e.consumed
+
+        while True:
+            await reader.readexactly(consumed)
+            try:
+                await reader.readuntil(b'\n')
+                return None
+            except asyncio.IncompleteReadError:
+                return None
+            except asyncio.LimitOverrunError as e:
+                consumed = e.consumed
+
+    async def _handle_client(self, reader, writer):
+        """Lee peticiones de un cliente y escribe las respuestas al terminar cada una"""
+        write_lock = asyncio.Lock()
+        tasks = set()
+        self._clients.add(asyncio.current_task())
+
+        async def respond(response: Dict):
+            async with write_lock:
+                writer.write((json.dumps(response, ensure_ascii=False) + '\n').encode('utf-8'))
+                await writer.drain()
+
+        async def wait_result(request_id, future, received: float):
+            try:
+                accepted = await future
+                response = {'id': request_id, 'accepted': accepted}
+            except Exception as e:
+                response = {'id': request_id, 'error': str(e)}
+            response['latency_ms'] = (time.perf_counter() - received) * 1000
+            try:
+                await respond(response)
+            except ConnectionError:
+                pass
+
+        try:
+            while True:
+                line = await self._read_line(reader)
+                if line is None:
+                    await respond({'id': None,
+                                   'error': f"Petición de más de {self.max_line} bytes"})
+                    continue
+                if not line:
+                    break
+                received = time.perf_counter()
+
+                request_id = None
+                try:
+                    request = json.loads(line)
+                    request_id = request.get('id')
+                    name = self._resolve_grammar(request)
+                    text = request['input']
+                    if not isinstance(text, str):
+                        raise ValueError("'input' debe ser una cadena")
+                except (ValueError, KeyError, AttributeError, RecursionError) as e:
+                    if isinstance(e, KeyError):
+                        e = ValueError(f"Falta el campo {e}")
+                    await respond({'id': request_id, 'error': str(e)})
+                    continue
+
+                future = asyncio.get_running_loop().create_future()
+                # Con la cola llena se deja de leer el socket (backpressure)
+                await self.queue.put((name, text, future))
+
+                task = asyncio.create_task(wait_result(request_id, future, received))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            if tasks:
+                await asyncio.gather(*tasks)
+        except (ConnectionError, asyncio.CancelledError):
+            # Cliente desconectado o servidor cerrándose
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            self._clients.discard(asyncio.current_task())
+            writer.close()
+
+    async def _run_batcher(self):
+        """Agrupa las peticiones en lotes por gramática y los envía a los procesos"""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.batch_window
+
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            groups: Dict[str, list] = {}
+            for name, text, future in batch:
+                groups.setdefault(name, []).append((text, future))
+
+            for name, items in groups.items():
+                await self._in_flight.acquire()
+                task = asyncio.create_task(self._dispatch(name, items))
+                self._dispatches.add(task)
+                task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, name: str, items: list):
+        """Parsea un lote en el executor y resuelve los futures de sus peticiones"""
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.executor, _parse_batch, name,
+                                                 [text for text, _ in items])
+            for (_, future), accepted in zip(items, results):
+                if not future.done():
+                    future.set_result(accepted)
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._in_flight.release()
+
+
+def parse_grammar_specs(specs: List[str]) -> Dict[str, str]:
+    """Convierte argumentos 'nombre=archivo' (o 'archivo') en un diccionario"""
+    grammar_files = {}
+    for spec in specs:
+        name, sep, filename = spec.partition('=')
+        if not sep:
+            name, filename = spec, spec
+        grammar_files[name] = filename
+    return grammar_files
+
+
+async def serve(args):
+    """Arranca el servidor y atiende peticiones hasta que se interrumpe"""
+    server = ParseServer(parse_grammar_specs(args.grammar), workers=args.workers,
+                         batch_size=args.batch_size, batch_window=args.batch_window / 1000,
+                         max_pending=args.max_pending, max_line=args.max_line)
+
+    if args.unix:
+        await server.start(path=args.unix)
+        print(f"Escuchando en {args.unix}", file=sys.stderr)
+    else:
+        await server.start(host=args.host, port=args.port)
+        print(f"Escuchando en {args.host}:{args.port}", file=sys.stderr)
+
+    try:
+        await server.server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    """Programa principal del servidor"""
+    arg_parser = argparse.ArgumentParser(description="Servidor de parsing LR(1)")
+    arg_parser.add_argument('-g', '--grammar', action='append', required=True,
+                            metavar='NOMBRE=ARCHIVO', help="gramática a cargar (repetible)")
+    arg_parser.add_argument('--host', default='127.0.0.1')
+    arg_parser.add_argument('--port', type=int, default=8765)
+    arg_parser.add_argument('--unix', metavar='PATH', help="socket Unix en lugar de TCP")
+    arg_parser.add_argument('--workers', type=int, default=2,
+                            help="procesos de parsing (0 = en este proceso)")
+    arg_parser.add_argument('--batch-size', type=int, default=64)
+    arg_parser.add_argument('--batch-window', type=float, default=2.0,
+                            help="milisegundos de espera para completar un lote")
+    arg_parser.add_argument('--max-pending', type=int, default=1024,
+                            help="peticiones en cola antes de aplicar backpressure")
+    arg_parser.add_argument('--max-line', type=int, default=2 ** 20,
+                            help="bytes máximos de una petición")
+    args = arg_parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
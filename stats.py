@@ -0,0 +1,73 @@
+# ============================================================================
+# stats.py
+# Tiempos por fase y contadores de las rutas críticas
+# ============================================================================
+
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+
+class Stats:
+    """
+    Estadísticas de construcción y parsing.
+
+    Se pasa opcionalmente a FirstCalculator, FollowCalculator, LR1Table y
+    Parser; con None (por defecto) no se registra nada.
+    """
+
+    def __init__(self):
+        self.timers: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self.last_parse: Dict[str, int] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        """Mide el tiempo de pared de una fase (se acumula si se repite)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timers[name] = self.timers.get(name, 0.0) + time.perf_counter() - start
+
+    def add(self, name: str, amount: int = 1):
+        """Suma `amount` a un contador"""
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record_parse(self, shifts: int, reduces: int, steps: int, accepted: bool,
+                     errors: int = 0):
+        """Registra los contadores de un parsing"""
+        self.last_parse = {'shifts': shifts, 'reduces': reduces,
+                           'steps': steps, 'accepted': accepted, 'errors': errors}
+        self.add('parse.count')
+        self.add('parse.accepted', int(accepted))
+        self.add('parse.shifts', shifts)
+        self.add('parse.reduces', reduces)
+        self.add('parse.steps', steps)
+        self.add('parse.errors', errors)
+
+    def goto_hit_rate(self) -> float:
+        """Fracción de transiciones GOTO resueltas por la caché de kernels"""
+        hits = self.counters.get('goto.cache_hits', 0)
+        total = hits + self.counters.get('goto.cache_misses', 0)
+        return hits / total if total else 0.0
+
+    def as_dict(self) -> Dict:
+        """Estadísticas como diccionario serializable"""
+        return {
+            'timers': dict(self.timers),
+            'counters': dict(self.counters),
+            'goto_hit_rate': self.goto_hit_rate(),
+            'last_parse': dict(self.last_parse),
+        }
+
+    def print_stats(self):
+        """Imprime las estadísticas"""
+        print("\n" + "=" * 60)
+        print("ESTADÍSTICAS")
+        print("=" * 60)
+        for name, seconds in self.timers.items():
+            print(f"{name:<30}{seconds * 1000:>12.3f} ms")
+        for name, value in sorted(self.counters.items()):
+            print(f"{name:<30}{value:>12}")
+        print(f"{'goto.cache_hit_rate':<30}{self.goto_hit_rate():>12.2%}")
@@ -1,4 +1,7 @@
-from typing import Set, FrozenSet, Dict, List, Tuple
+import sys
+from typing import Set, FrozenSet, Dict, List, Optional, Tuple
+
+from report import TableReport
 
 
 class LR1Item:
@@ -35,27 +38,97 @@ class LR1Item:
         return self.dot >= len(self.rhs)
 
 
+class LazyStates:
+    """
+    Secuencia de estados que conserva solo los kernels y recalcula el closure
+    completo al acceder a cada estado, sin sumarlo a las estadísticas de la
+    construcción. Sin kernels, los items no están disponibles y solo se
+    conoce la cantidad de estados.
+    """
+
+    def __init__(self, lr1_table, kernels: List[FrozenSet[LR1Item]] = None, size: int = 0):
+        self.table = lr1_table
+        self.kernels = kernels
+        self.size = len(kernels) if kernels is not None else size
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if self.kernels is None:
+            raise ValueError("Los items de los estados se descartaron (storage='none')")
+        if isinstance(index, slice):
+            return [self.table._closure(kernel) for kernel in self.kernels[index]]
+        return self.table._closure(self.kernels[index])
+
+    def __iter__(self):
+        for i in range(self.size):
+            yield self[i]
+
+
 class LR1Table:
     """Construye la tabla LR(1) con estados y transiciones"""
 
-    def __init__(self, grammar, first_calculator):
+    STORAGE_MODES = ('full', 'kernel', 'none')
+
+    def __init__(self, grammar, first_calculator, minimize: bool = False, stats=None,
+                 storage: str = 'full'):
         """
         Args:
             grammar: objeto Grammar
             first_calculator: objeto FirstCalculator
+            minimize: si se fusionan los estados con filas ACTION/GOTO equivalentes
+            stats: objeto Stats opcional para registrar tiempos y contadores
+            storage: items que se conservan tras construir las tablas:
+                     'full' (closures completos), 'kernel' (solo kernels, el
+                     closure se recalcula al consultarlo) o 'none' (ninguno)
         """
+        if storage not in self.STORAGE_MODES:
+            raise ValueError(f"storage debe ser uno de {self.STORAGE_MODES}, no '{storage}'")
+
         self.grammar = grammar
         self.first_calc = first_calculator
+        self.stats = stats
         self.states = []
         self.state_transitions = {}
         self.action_table = {}
         self.goto_table = {}
-
-        self._build_states()
-        self._build_tables()
+        # Conflictos (estado, terminal, acción anterior, acción nueva); la
+        # nueva acción reemplaza a la anterior
+        self.conflicts = []
+        self._recovery_actions = None
+
+        if stats is None:
+            self._build_states()
+            self._build_tables()
+            if minimize:
+                self._minimize_states()
+        else:
+            with stats.phase('table.states'):
+                self._build_states()
+            with stats.phase('table.fill'):
+                self._build_tables()
+            if minimize:
+                with stats.phase('table.minimize'):
+                    self._minimize_states()
+            stats.add('table.states', len(self.states))
+
+        self.storage = storage
+        if storage != 'full':
+            self._release_states(storage)
 
     def closure(self, items: Set[LR1Item]) -> FrozenSet[LR1Item]:
         """Calcula la clausura de un conjunto de items LR(1)"""
+        closure_set = self._closure(items)
+
+        if self.stats is not None:
+            self.stats.add('closure.calls')
+            self.stats.add('closure.items_created', len(closure_set) - len(items))
+
+        return closure_set
+
+    def _closure(self, items: Set[LR1Item]) -> FrozenSet[LR1Item]:
+        """Clausura sin registrar estadísticas (para recalcular estados ya construidos)"""
         closure_set = set(items)
 
         changed = True
@@ -85,8 +158,8 @@ class LR1Table:
 
         return frozenset(closure_set)
 
-    def goto(self, items: FrozenSet[LR1Item], symbol: str) -> FrozenSet[LR1Item]:
-        """Calcula GOTO(I, X)"""
+    def goto_kernel(self, items: FrozenSet[LR1Item], symbol: str) -> FrozenSet[LR1Item]:
+        """Calcula el kernel de GOTO(I, X), es decir, GOTO(I, X) antes del closure"""
         goto_set = set()
 
         for item in items:
@@ -94,6 +167,12 @@ class LR1Table:
                 new_item = LR1Item(item.lhs, item.rhs, item.dot + 1, item.lookahead)
                 goto_set.add(new_item)
 
+        return frozenset(goto_set)
+
+    def goto(self, items: FrozenSet[LR1Item], symbol: str) -> FrozenSet[LR1Item]:
+        """Calcula GOTO(I, X)"""
+        goto_set = self.goto_kernel(items, symbol)
+
         if goto_set:
             return self.closure(goto_set)
         return frozenset()
@@ -110,6 +189,11 @@ class LR1Table:
         state_map = {initial_state: 0}
         pending = [initial_state]
 
+        # Un estado LR(1) queda determinado por su kernel: si el kernel ya se
+        # vio, se reutiliza el estado sin recalcular el closure
+        kernel_map = {}
+        cache_hits = 0
+
         while pending:
             current_state = pending.pop(0)
             current_index = state_map[current_state]
@@ -122,17 +206,35 @@ class LR1Table:
                     symbols.add(next_sym)
 
             for symbol in symbols:
-                next_state = self.goto(current_state, symbol)
+                kernel = self.goto_kernel(current_state, symbol)
+
+                if kernel in kernel_map:
+                    cache_hits += 1
+                    self.state_transitions[(current_index, symbol)] = kernel_map[kernel]
+                    continue
 
-                if next_state:
-                    if next_state not in state_map:
-                        state_map[next_state] = len(self.states)
-                        self.states.append(next_state)
-                        pending.append(next_state)
+                next_state = self.closure(kernel)
 
-                    # Guardar transición
-                    next_index = state_map[next_state]
-                    self.state_transitions[(current_index, symbol)] = next_index
+                if next_state not in state_map:
+                    state_map[next_state] = len(self.states)
+                    self.states.append(next_state)
+                    pending.append(next_state)
+
+                # Guardar transición
+                next_index = state_map[next_state]
+                kernel_map[kernel] = next_index
+                self.state_transitions[(current_index, symbol)] = next_index
+
+        if self.stats is not None:
+            self.stats.add('goto.cache_hits', cache_hits)
+            self.stats.add('goto.cache_misses', len(kernel_map))
+
+    def _set_action(self, state: int, terminal: str, action):
+        """Asigna una acción; si ya había otra distinta se registra el conflicto"""
+        previous = self.action_table[state].get(terminal)
+        if previous is not None and previous != action:
+            self.conflicts.append((state, terminal, previous, action))
+        self.action_table[state][terminal] = action
 
     def _build_tables(self):
         """Construye las tablas ACTION y GOTO"""
@@ -145,13 +247,13 @@ class LR1Table:
                     # Reducción
                     if item.lhs == self.grammar.augmented_start:
                         # Accept
-                        self.action_table[i]['$'] = 'acc'
+                        self._set_action(i, '$', 'acc')
                     else:
                         # Buscar número de producción
                         prod_num = self.grammar.get_production_number(item.lhs, item.rhs)
 
                         if prod_num != -1:
-                            self.action_table[i][item.lookahead] = ('r', prod_num)
+                            self._set_action(i, item.lookahead, ('r', prod_num))
                 else:
                     next_sym = item.next_symbol()
 
@@ -159,7 +261,7 @@ class LR1Table:
                         # Shift
                         if (i, next_sym) in self.state_transitions:
                             next_index = self.state_transitions[(i, next_sym)]
-                            self.action_table[i][next_sym] = ('s', next_index)
+                            self._set_action(i, next_sym, ('s', next_index))
 
             # GOTO para no terminales
             for non_term in self.grammar.non_terminals:
@@ -167,94 +269,170 @@ class LR1Table:
                     next_index = self.state_transitions[(i, non_term)]
                     self.goto_table[i][non_term] = next_index
 
-    def print_closure_table(self):
-        """Imprime la tabla de closure con los kernels"""
-        print("\n" + "=" * 80)
-        print("TABLA LR(1) CLOSURE")
-        print("=" * 80)
-        print(f"{'Goto':<20}{'Kernel':<30}{'State':<8}{'Closure'}")
-        print("-" * 80)
-
-        for i, state in enumerate(self.states):
-            # Buscar qué goto lleva a este estado
-            goto_str = ""
-            for (from_state, symbol), to_state in self.state_transitions.items():
-                if to_state == i:
-                    goto_str = f"goto({from_state}, {symbol})"
-                    break
-
-            # Obtener kernel (items iniciales antes del closure)
-            kernel_items = [item for item in state if item.dot > 0 or
-                            item.lhs == self.grammar.augmented_start]
+    def _row_signature(self, i: int, block_of: List[int]) -> Tuple:
+        """Firma de las filas ACTION/GOTO de un estado según la partición actual"""
+        actions = []
+        for terminal, action in self.action_table[i].items():
+            if isinstance(action, tuple) and action[0] == 's':
+                actions.append((terminal, ('s', block_of[action[1]])))
+            else:
+                actions.append((terminal, action))
 
-            if not kernel_items:
-                kernel_items = list(state)[:1]
+        gotos = [(non_term, block_of[target])
+                 for non_term, target in self.goto_table[i].items()]
 
-            kernel_str = str(kernel_items[0]) if kernel_items else ""
+        return tuple(sorted(actions, key=str)), tuple(sorted(gotos))
 
-            # Primera línea
-            print(f"{goto_str:<20}{kernel_str:<30}{i:<8}", end="")
+    def _minimize_states(self):
+        """
+        Fusiona los estados equivalentes (refinamiento de particiones al
+        estilo de la minimización de AFD de Hopcroft) y renumera las tablas.
+
+        Dos estados son equivalentes si tienen las mismas reducciones y
+        aceptaciones, y sus desplazamientos y GOTO llevan a estados
+        equivalentes. El análisis sintáctico no cambia.
+
+        La equivalencia exige filas idénticas, así que en gramáticas sin
+        conflictos en la práctica no fusiona nada: ninguna gramática del
+        benchmark ni las LR(1) aleatorias pierden estados. Solo reduce la
+        cantidad de estados cuando hubo conflictos sobrescritos (ver
+        self.conflicts).
+        """
+        num_states = len(self.states)
+
+        # Partición inicial: todos los estados en un mismo bloque; la primera
+        # ronda de refinamiento separa por reducciones y símbolos definidos
+        block_of = [0] * num_states
+        num_blocks = 1
+
+        # Refinar hasta punto fijo
+        while True:
+            signatures = {}
+            new_block_of = []
+            for i in range(num_states):
+                signature = (block_of[i], self._row_signature(i, block_of))
+                new_block_of.append(signatures.setdefault(signature, len(signatures)))
+
+            block_of = new_block_of
+            if len(signatures) == num_blocks:
+                break
+            num_blocks = len(signatures)
+
+        if num_blocks == num_states:
+            return
+
+        # Renumerar: los bloques reciben índices consecutivos nuevos en el orden
+        # de su estado de menor índice (no el número de ese estado), así el
+        # estado inicial sigue siendo el 0
+        new_index = {}
+        representatives = []
+        for i in range(num_states):
+            if block_of[i] not in new_index:
+                new_index[block_of[i]] = len(representatives)
+                representatives.append(i)
+
+        def renumber(state: int) -> int:
+            return new_index[block_of[state]]
+
+        action_table = {}
+        goto_table = {}
+        for new_i, old_i in enumerate(representatives):
+            action_table[new_i] = {}
+            for terminal, action in self.action_table[old_i].items():
+                if isinstance(action, tuple) and action[0] == 's':
+                    action = ('s', renumber(action[1]))
+                action_table[new_i][terminal] = action
+
+            goto_table[new_i] = {non_term: renumber(target)
+                                 for non_term, target in self.goto_table[old_i].items()}
+
+        state_transitions = {}
+        for (from_state, symbol), to_state in self.state_transitions.items():
+            key = (renumber(from_state), symbol)
+            if key not in state_transitions:
+                state_transitions[key] = renumber(to_state)
+
+        self.states = [self.states[i] for i in representatives]
+        self.state_transitions = state_transitions
+        self.action_table = action_table
+        self.goto_table = goto_table
+
+    def recovery_actions(self) -> Dict[int, Dict[str, Optional[str]]]:
+        """
+        Para cada estado, los terminales con los que puede continuar la
+        recuperación en modo pánico: None si el estado los acepta
+        directamente, o el primer no terminal A (en orden alfabético) tal que
+        GOTO(estado, A) los acepta. Se calcula una sola vez por tabla.
+        """
+        if self._recovery_actions is None:
+            recovery = {}
+            for state, row in self.action_table.items():
+                entry = dict.fromkeys(row)
+                for non_term, target in sorted(self.goto_table.get(state, {}).items()):
+                    for terminal in self.action_table.get(target, ()):
+                        entry.setdefault(terminal, non_term)
+                recovery[state] = entry
+            self._recovery_actions = recovery
+        return self._recovery_actions
+
+    def kernel(self, state: FrozenSet[LR1Item]) -> FrozenSet[LR1Item]:
+        """Items del kernel de un estado: los que no agrega el closure"""
+        return frozenset(item for item in state
+                         if item.dot > 0 or item.lhs == self.grammar.augmented_start)
+
+    def _release_states(self, storage: str):
+        """Libera los closures una vez construidas las tablas"""
+        if storage == 'kernel':
+            self.states = LazyStates(self, [self.kernel(state) for state in self.states])
+        else:
+            self.states = LazyStates(self, size=len(self.states))
+
+    def to_dict(self) -> Dict:
+        """Tablas ACTION/GOTO y transiciones en un diccionario serializable a JSON"""
+        def encode(action):
+            return list(action) if isinstance(action, tuple) else action
+
+        return {
+            'num_states': len(self.states),
+            'action': {str(i): {terminal: encode(action) for terminal, action in row.items()}
+                       for i, row in self.action_table.items()},
+            'goto': {str(i): dict(row) for i, row in self.goto_table.items()},
+            'transitions': [[from_state, symbol, to_state]
+                            for (from_state, symbol), to_state in self.state_transitions.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, grammar, data: Dict) -> 'LR1Table':
+        """
+        Reconstruye una tabla desde to_dict() sin recalcular los estados.
+        Los items no están disponibles (equivale a storage='none').
+        """
+        def decode(action):
+            return tuple(action) if isinstance(action, list) else action
+
+        lr1_table = cls.__new__(cls)
+        lr1_table.grammar = grammar
+        lr1_table.first_calc = None
+        lr1_table.stats = None
+        lr1_table.storage = 'none'
+        lr1_table.conflicts = []
+        lr1_table._recovery_actions = None
+        lr1_table.action_table = {int(i): {terminal: decode(action) for terminal, action in row.items()}
+                                  for i, row in data['action'].items()}
+        lr1_table.goto_table = {int(i): dict(row) for i, row in data['goto'].items()}
+        lr1_table.state_transitions = {(from_state, symbol): to_state
+                                       for from_state, symbol, to_state in data['transitions']}
+        lr1_table.states = LazyStates(lr1_table, size=data['num_states'])
+        return lr1_table
 
-            # Closure
-            closure_strs = [str(item) for item in sorted(state, key=lambda x: str(x))]
-            if closure_strs:
-                print(closure_strs[0])
-                for closure_str in closure_strs[1:]:
-                    print(f"{'':<58}{closure_str}")
+    def print_closure_table(self):
+        """Imprime la tabla de closure con los kernels"""
+        TableReport(self).write_closure_table(sys.stdout)
 
     def print_states(self):
         """Imprime todos los estados LR(1)"""
-        print("\n" + "=" * 80)
-        print("ESTADOS LR(1)")
-        print("=" * 80)
-        for i, state in enumerate(self.states):
-            print(f"\nEstado {i}:")
-            for item in sorted(state, key=lambda x: str(x)):
-                print(f"  {item}")
+        TableReport(self).write_states(sys.stdout)
 
     def print_action_goto_tables(self):
         """Imprime las tablas ACTION y GOTO en formato de tabla"""
-        print("\n" + "=" * 100)
-        print("TABLA LR(1) - ACTION Y GOTO")
-        print("=" * 100)
-
-        # Encabezados
-        terminals = sorted(self.grammar.terminals) + ['$']
-        non_terminals = sorted([nt for nt in self.grammar.non_terminals
-                                if nt != self.grammar.augmented_start])
-
-        # Encabezado principal
-        print(f"{'State':<8}", end="")
-        print("ACTION".ljust(len(terminals) * 12), end="")
-        print("GOTO".ljust(len(non_terminals) * 12))
-
-        # Sub-encabezados
-        print(" " * 8, end="")
-        for term in terminals:
-            print(f"{term:<12}", end="")
-        for nt in non_terminals:
-            print(f"{nt:<12}", end="")
-        print()
-        print("-" * 100)
-
-        # Filas de la tabla
-        for i in range(len(self.states)):
-            print(f"{i:<8}", end="")
-
-            # Columnas ACTION
-            for term in terminals:
-                action = self.action_table[i].get(term, '')
-                if action == 'acc':
-                    print(f"{'acc':<12}", end="")
-                elif isinstance(action, tuple):
-                    action_str = f"{action[0]}{action[1]}"
-                    print(f"{action_str:<12}", end="")
-                else:
-                    print(f"{'':<12}", end="")
-
-            # Columnas GOTO
-            for nt in non_terminals:
-                goto = self.goto_table[i].get(nt, '')
-                print(f"{str(goto):<12}", end="")
-
-            print()
\ No newline at end of file
+        TableReport(self).write_action_goto_tables(sys.stdout)